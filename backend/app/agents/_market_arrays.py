@@ -0,0 +1,60 @@
+
+import numpy as np
+from typing import Dict, Any, List, NamedTuple
+
+class MarketArrays(NamedTuple):
+    """Column (SoA) view of the coin dicts"""
+    price: np.ndarray  # float64, NaN where price is missing/zero
+    market_cap: np.ndarray  # int64, 0 where missing
+    volume: np.ndarray  # int64, 0 where missing
+    change_24h: np.ndarray  # float64, NaN where missing
+
+def to_arrays(crypto_data: List[Dict[str, Any]]) -> MarketArrays:
+    """Extract the analysed fields once into parallel NumPy arrays"""
+    n = len(crypto_data)
+    return MarketArrays(
+        price=np.fromiter(
+            (coin.get("current_price") or np.nan for coin in crypto_data), dtype=np.float64, count=n
+        ),
+        market_cap=np.fromiter(
+            (int(coin.get("market_cap") or 0) for coin in crypto_data), dtype=np.int64, count=n
+        ),
+        volume=np.fromiter(
+            (int(coin.get("total_volume") or 0) for coin in crypto_data), dtype=np.int64, count=n
+        ),
+        change_24h=np.fromiter(
+            (
+                np.nan if coin.get("price_change_percentage_24h") is None
+                else coin["price_change_percentage_24h"]
+                for coin in crypto_data
+            ),
+            dtype=np.float64,
+            count=n
+        )
+    )
+
+def market_aggregates(arrays: MarketArrays) -> Dict[str, Any]:
+    """Every market/price/volume aggregate from one set of vectorized reductions"""
+    price = arrays.price[~np.isnan(arrays.price)]
+    change = arrays.change_24h[~np.isnan(arrays.change_24h)]
+    has_volume = arrays.volume != 0
+    volume_count = int(has_volume.sum())
+    volume_sum = int(arrays.volume.sum())
+
+    return {
+        "price_mean": float(price.mean()) if price.size else 0,
+        "price_median": float(np.median(price)) if price.size else 0,
+        "price_min": float(price.min()) if price.size else 0,
+        "price_max": float(price.max()) if price.size else 0,
+        "market_cap_sum": int(arrays.market_cap.sum()),
+        "change_count": int(change.size),
+        "change_mean": float(change.mean()) if change.size else 0,
+        "change_positive": int((change > 0).sum()),
+        "change_negative": int((change < 0).sum()),
+        "change_max": float(change.max()) if change.size else 0,
+        "change_min": float(change.min()) if change.size else 0,
+        "volume_count": volume_count,
+        "volume_sum": volume_sum,
+        "volume_mean": volume_sum / volume_count if volume_count else 0,
+        "volume_argmax": int(arrays.volume.argmax()) if volume_count else -1
+    }
@@ -0,0 +1,122 @@
+
+import math
+from html import escape
+from typing import List, Sequence
+
+# matplotlib's default (tab10) palette so charts look the same as before
+_PALETTE = (
+    "#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+    "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"
+)
+
+def _fmt(value: float) -> str:
+    """Compact tick/label number (1.2T, 350M, 4.5)"""
+    for div, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= div:
+            return f"{value / div:.3g}{suffix}"
+    return f"{value:.3g}"
+
+def bar_chart(
+    labels: Sequence[str],
+    values: Sequence[float],
+    title: str,
+    y_label: str = "",
+    colors: Sequence[str] | None = None,
+    opacity: float = 1.0,
+    width: int = 900,
+    height: int = 450
+) -> str:
+    """Bar chart as a standalone SVG document (negative values drawn below the zero line)"""
+    left, right, top, bottom = 90, 20, 40, 110
+    plot_w = width - left - right
+    plot_h = height - top - bottom
+
+    values = [float(v) for v in values]
+    vmin = min(0.0, min(values, default=0.0))
+    vmax = max(0.0, max(values, default=0.0))
+    if vmax == vmin:
+        vmax = vmin + 1
+
+    def y(v: float) -> float:
+        return top + (vmax - v) / (vmax - vmin) * plot_h
+
+    parts: List[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        f'<text x="{width / 2}" y="{top / 2 + 5}" text-anchor="middle" font-size="16">{escape(title)}</text>'
+    ]
+
+    # Y axis grid/ticks
+    for i in range(5):
+        v = vmin + (vmax - vmin) * i / 4
+        ty = y(v)
+        parts.append(f'<line x1="{left}" y1="{ty:.1f}" x2="{width - right}" y2="{ty:.1f}" stroke="#e0e0e0"/>')
+        parts.append(f'<text x="{left - 6}" y="{ty + 4:.1f}" text-anchor="end">{_fmt(v)}</text>')
+    if y_label:
+        parts.append(
+            f'<text x="15" y="{top + plot_h / 2}" text-anchor="middle" '
+            f'transform="rotate(-90 15 {top + plot_h / 2})">{escape(y_label)}</text>'
+        )
+
+    # Bars + rotated category labels
+    n = len(values)
+    slot = plot_w / n if n else plot_w
+    zero_y = y(0.0)
+    for i, (label, v) in enumerate(zip(labels, values)):
+        x = left + i * slot + slot * 0.1
+        bar_top = min(y(v), zero_y)
+        color = colors[i] if colors is not None else "skyblue"
+        parts.append(
+            f'<rect x="{x:.1f}" y="{bar_top:.1f}" width="{slot * 0.8:.1f}" '
+            f'height="{abs(y(v) - zero_y):.1f}" fill="{color}" fill-opacity="{opacity}"/>'
+        )
+        lx = left + (i + 0.5) * slot
+        ly = top + plot_h + 14
+        parts.append(
+            f'<text x="{lx:.1f}" y="{ly}" text-anchor="end" '
+            f'transform="rotate(-45 {lx:.1f} {ly})">{escape(str(label))}</text>'
+        )
+
+    parts.append(f'<line x1="{left}" y1="{zero_y:.1f}" x2="{width - right}" y2="{zero_y:.1f}" stroke="black" stroke-opacity="0.3"/>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+def pie_chart(labels: Sequence[str], values: Sequence[float], title: str, size: int = 500) -> str:
+    """Pie chart with percentage labels as a standalone SVG document (first slice starts at 12 o'clock)"""
+    cx = cy = size / 2
+    r = size * 0.32
+    total = float(sum(values)) or 1.0
+
+    parts: List[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {size} {size}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{size}" height="{size}" fill="white"/>',
+        f'<text x="{cx}" y="30" text-anchor="middle" font-size="16">{escape(title)}</text>'
+    ]
+
+    angle = math.pi / 2  # start at the top, counter-clockwise like matplotlib's startangle=90
+    for i, (label, v) in enumerate(zip(labels, values)):
+        frac = float(v) / total
+        sweep = frac * 2 * math.pi
+        color = _PALETTE[i % len(_PALETTE)]
+        if frac >= 1:
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}"/>')
+        else:
+            x1, y1 = cx + r * math.cos(angle), cy - r * math.sin(angle)
+            x2, y2 = cx + r * math.cos(angle + sweep), cy - r * math.sin(angle + sweep)
+            large = 1 if sweep > math.pi else 0
+            parts.append(
+                f'<path d="M{cx},{cy} L{x1:.2f},{y1:.2f} A{r},{r} 0 {large} 0 {x2:.2f},{y2:.2f} Z" fill="{color}"/>'
+            )
+
+        mid = angle + sweep / 2
+        px, py = cx + r * 0.6 * math.cos(mid), cy - r * 0.6 * math.sin(mid)
+        lx, ly = cx + r * 1.15 * math.cos(mid), cy - r * 1.15 * math.sin(mid)
+        anchor = "start" if math.cos(mid) >= 0 else "end"
+        parts.append(f'<text x="{px:.1f}" y="{py + 4:.1f}" text-anchor="middle">{frac * 100:.1f}%</text>')
+        parts.append(f'<text x="{lx:.1f}" y="{ly + 4:.1f}" text-anchor="{anchor}">{escape(str(label))}</text>')
+        angle += sweep
+
+    parts.append("</svg>")
+    return "".join(parts)
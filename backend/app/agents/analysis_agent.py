@@ -1,11 +1,17 @@
 
 import logging
 from typing import Dict, Any, List
-import statistics
-from datetime import datetime
+import heapq
+from ._market_arrays import to_arrays, market_aggregates
 
 logger = logging.getLogger(__name__)
 
+def _market_cap_key(coin: Dict) -> float:
+    return coin.get("market_cap") or 0
+
+def _change_24h_key(coin: Dict) -> float:
+    return coin["price_change_percentage_24h"]
+
 class AnalysisAgent:
     def __init__(self):
         self.name = "AnalysisAgent"
@@ -15,31 +21,35 @@ class AnalysisAgent:
         try:
             logger.info("📊 AnalysisAgent: Starting analysis...")
             
-            crypto_data = state.get("crypto_data", [])
+            crypto_data = state.get("validated_crypto_data", [])
             if not crypto_data:
                 raise Exception("No crypto data to analyze")
             
             analysis_results = {}
             
+            # All aggregates computed once over column arrays
+            aggregates = market_aggregates(to_arrays(crypto_data))
+            
             # 1. Market Overview
-            analysis_results["market_overview"] = self._analyze_market_overview(crypto_data)
+            analysis_results["market_overview"] = self._analyze_market_overview(crypto_data, aggregates)
             
             # 2. Price Analysis (if data available)
             if state.get("has_price_changes", False):
-                analysis_results["price_trends"] = self._analyze_price_trends(crypto_data)
+                analysis_results["price_trends"] = self._analyze_price_trends(aggregates)
             else:   
                 analysis_results["price_trends"] = {"note": "Price change data not available"}
             
             # 3. Volume Analysis
-            analysis_results["volume_analysis"] = self._analyze_volume(crypto_data)
+            analysis_results["volume_analysis"] = self._analyze_volume(crypto_data, aggregates)
             
             # 4. Top Performers
-            analysis_results["top_performers"] = self._find_top_performers(crypto_data)
+            analysis_results["top_performers"] = self._find_top_performers(
+                crypto_data, state.get("market_stats")
+            )
             
             # Update state
             state["analysis_results"] = analysis_results
             state["analysis_status"] = "completed"
-            state["analysis_timestamp"] = datetime.now().isoformat()
             
             logger.info("✅ AnalysisAgent: Analysis completed successfully")
             return state
@@ -50,70 +60,56 @@ class AnalysisAgent:
             state["analysis_error"] = str(e)
             return state
     
-    def _analyze_market_overview(self, crypto_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_market_overview(self, crypto_data: List[Dict], aggregates: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate basic market statistics"""
-        prices = [float(coin["current_price"]) for coin in crypto_data if coin["current_price"]]
-        market_caps = [int(coin["market_cap"]) for coin in crypto_data if coin["market_cap"]]
-        
         return {
             "total_cryptos_analyzed": len(crypto_data),
-            "total_market_cap": sum(market_caps),
-            "average_price": statistics.mean(prices) if prices else 0,
-            "median_price": statistics.median(prices) if prices else 0,
+            "total_market_cap": aggregates["market_cap_sum"],
+            "average_price": aggregates["price_mean"],
+            "median_price": aggregates["price_median"],
             "price_range": {
-                "min": min(prices) if prices else 0,
-                "max": max(prices) if prices else 0
+                "min": aggregates["price_min"],
+                "max": aggregates["price_max"]
             }
         }
     
-    def _analyze_price_trends(self, crypto_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_price_trends(self, aggregates: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze price change trends"""
-        changes_24h = [
-            float(coin["price_change_percentage_24h"]) 
-            for coin in crypto_data 
-            if coin.get("price_change_percentage_24h") is not None
-        ]
-        
-        if not changes_24h:
+        if aggregates["change_count"] == 0:
             return {"note": "No price change data available"}
         
-        positive_changes = [c for c in changes_24h if c > 0]
-        negative_changes = [c for c in changes_24h if c < 0]
-        
         return {
-            "average_24h_change": statistics.mean(changes_24h),
-            "positive_movers": len(positive_changes),
-            "negative_movers": len(negative_changes),
-            "strongest_gain": max(changes_24h),
-            "biggest_loss": min(changes_24h)
+            "average_24h_change": aggregates["change_mean"],
+            "positive_movers": aggregates["change_positive"],
+            "negative_movers": aggregates["change_negative"],
+            "strongest_gain": aggregates["change_max"],
+            "biggest_loss": aggregates["change_min"]
         }
     
-    def _analyze_volume(self, crypto_data: List[Dict]) -> Dict[str, Any]:
+    def _analyze_volume(self, crypto_data: List[Dict], aggregates: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze trading volume"""
-        volumes = [int(coin["total_volume"]) for coin in crypto_data if coin["total_volume"]]
-        
-        if not volumes:
+        if aggregates["volume_count"] == 0:
             return {"note": "Volume data not available"}
         
         return {
-            "total_volume": sum(volumes),
-            "average_volume": statistics.mean(volumes),
-            "highest_volume_crypto": max(crypto_data, key=lambda x: x.get("total_volume", 0))["name"]
+            "total_volume": aggregates["volume_sum"],
+            "average_volume": aggregates["volume_mean"],
+            "highest_volume_crypto": crypto_data[aggregates["volume_argmax"]]["name"]
         }
     
-    def _find_top_performers(self, crypto_data: List[Dict]) -> Dict[str, Any]:
+    def _find_top_performers(self, crypto_data: List[Dict], market_stats: Dict[str, Any] | None = None) -> Dict[str, Any]:
         """Find top performing cryptocurrencies"""
-        # Sort by market cap
-        by_market_cap = sorted(crypto_data, key=lambda x: x.get("market_cap", 0), reverse=True)[:5]
+        # Sort by market cap and find coins with a 24h change
+        # (reuse the precomputed ranking and index list when available)
+        if market_stats:
+            by_market_cap = [crypto_data[i] for i in market_stats["mc_top_idx"][:5]]
+            with_change = [crypto_data[i] for i in market_stats["change_valid_idx"]]
+        else:
+            by_market_cap = heapq.nlargest(5, crypto_data, key=_market_cap_key)
+            with_change = [coin for coin in crypto_data if coin.get("price_change_percentage_24h") is not None]
         
-        # Sort by 24h change if available
-        by_change = []
-        if any(coin.get("price_change_percentage_24h") for coin in crypto_data):
-            by_change = sorted(
-                [coin for coin in crypto_data if coin.get("price_change_percentage_24h")],
-                key=lambda x: x["price_change_percentage_24h"],
-                reverse=True
-            )[:5]
+        # Sort by 24h change if available (empty list means no data)
+        by_change = heapq.nlargest(5, with_change, key=_change_24h_key) if with_change else []
         
         return {
             "top_by_market_cap": [{"name": coin["name"], "market_cap": coin["market_cap"]} for coin in by_market_cap],
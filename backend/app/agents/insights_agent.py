@@ -1,19 +1,36 @@
 
 import logging
+import re
+from collections import OrderedDict
 from typing import Dict, Any, List
-import openai
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Numbered ("1." / "1)") or bulleted ("-" / "•") insight line, capturing the
+# non-empty text; markdown rules ("---") and empty bullets don't match
+_INSIGHT_RE = re.compile(r"^(?!\s*-+\s*$)\s*(?:\d+[.)]|[-•])\s*(\S.*?)\s*$")
+
 class AIInsightsAgent:
     def __init__(self):
         self.name = "AIInsightsAgent"
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._client = None
+        
+        # LRU of structured insights keyed by market summary
+        self._insights_cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._cache_size = 32
         
-    def generate_insights(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    @property
+    def client(self):
+        """AsyncOpenAI client, created (and openai imported) on first use"""
+        if self._client is None:
+            import openai
+            self._client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+    
+    async def generate_insights(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate AI-powered insights from analysis results"""
         try:
             logger.info("🤖 AIInsightsAgent: Generating insights...")
@@ -24,26 +41,17 @@ class AIInsightsAgent:
             # Create market summary for AI
             market_summary = self._create_market_summary(analysis_results, crypto_data, state)
             
-            # Generate insights using GPT
-            prompt = self._create_insights_prompt(market_summary)
+            # Identical market state -> reuse previous insights, skip the API round-trip
+            insights = self._get_cached_insights(market_summary)
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional cryptocurrency market analyst. Provide clear, actionable insights based on the data provided."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
-            )
-            
-            ai_insights = response.choices[0].message.content
-            
-            # Parse insights into structured format
-            insights = self._structure_insights(ai_insights)
+            if insights is None:
+                # Generate insights using GPT, parsed as the response streams in
+                prompt = self._create_insights_prompt(market_summary)
+                insights = await self._stream_insights(prompt)
+                self._cache_insights(market_summary, insights)
             
             # Update state
-            state["ai_insights"] = insights
+            state["ai_insights"] = list(insights)
             state["insights_status"] = "completed"
             
             logger.info("✅ AI insights generated successfully")
@@ -58,6 +66,20 @@ class AIInsightsAgent:
             state["ai_insights"] = self._generate_fallback_insights(state)
             return state
     
+    def _get_cached_insights(self, market_summary: str) -> List[str] | None:
+        """Return cached insights for a market summary (marks entry as recently used)"""
+        insights = self._insights_cache.get(market_summary)
+        if insights is not None:
+            self._insights_cache.move_to_end(market_summary)
+        return insights
+    
+    def _cache_insights(self, market_summary: str, insights: List[str]) -> None:
+        """Store insights, evicting the least recently used entry when full"""
+        self._insights_cache[market_summary] = insights
+        self._insights_cache.move_to_end(market_summary)
+        if len(self._insights_cache) > self._cache_size:
+            self._insights_cache.popitem(last=False)
+    
     def _create_market_summary(self, analysis_results: Dict, crypto_data: List, state: Dict) -> str:
         """Create a summary of market data for AI processing"""
         market_overview = analysis_results.get("market_overview", {})
@@ -70,7 +92,7 @@ class AIInsightsAgent:
         - Average price: ${market_overview.get('average_price', 0):,.2f}
         """
         
-        if price_trends:
+        if "average_24h_change" in price_trends:
             summary += f"""
         - Average 24h change: {price_trends.get('average_24h_change', 0):.2f}%
         - Positive movers: {price_trends.get('positive_movers', 0)}
@@ -78,7 +100,7 @@ class AIInsightsAgent:
         """
         
         # Add top performers
-        top_performers = analysis_results.get("top_performers", {}).get("by_market_cap", [])[:3]
+        top_performers = analysis_results.get("top_performers", {}).get("top_by_market_cap", [])[:3]
         if top_performers:
             summary += "\nTop performers by market cap:\n"
             for coin in top_performers:
@@ -102,21 +124,46 @@ class AIInsightsAgent:
         Keep insights professional, concise, and actionable for investors.
         """
     
-    def _structure_insights(self, ai_insights: str) -> List[str]:
-        """Structure AI insights into a list"""
-        # Split by numbered points or bullet points
+    async def _stream_insights(self, prompt: str) -> List[str]:
+        """Stream the completion and structure insights line by line, stopping at 4"""
+        stream = await self.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a professional cryptocurrency market analyst. Provide clear, actionable insights based on the data provided."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=500,
+            temperature=0.7,
+            stream=True
+        )
+        
+        # Keep numbered points or bullet points, without the numbering/bullets
         insights = []
-        lines = ai_insights.split('\n')
+        buffer = ""
         
-        for line in lines:
-            line = line.strip()
-            if line and (line[0].isdigit() or line.startswith('•') or line.startswith('-')):
-                # Remove numbering/bullets and add to insights
-                clean_line = line.lstrip('0123456789.•- ').strip()
-                if clean_line:
-                    insights.append(clean_line)
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                buffer += chunk.choices[0].delta.content or ""
+                
+                while "\n" in buffer and len(insights) < 4:
+                    line, buffer = buffer.split("\n", 1)
+                    match = _INSIGHT_RE.match(line)
+                    if match:
+                        insights.append(match.group(1))
+                
+                if len(insights) == 4:  # Limit to 4 insights
+                    break
+            else:
+                # Last line may arrive without a trailing newline
+                match = _INSIGHT_RE.match(buffer)
+                if match:
+                    insights.append(match.group(1))
+        finally:
+            await stream.close()
         
-        return insights[:4]  # Limit to 4 insights
+        return insights
     
     def _generate_fallback_insights(self, state: Dict) -> List[str]:
         """Generate basic insights if AI fails"""
@@ -129,7 +176,7 @@ class AIInsightsAgent:
             f"Average cryptocurrency price in this dataset is ${market_overview.get('average_price', 0):,.2f}"
         ]
         
-        if price_trends:
+        if "average_24h_change" in price_trends:
             avg_change = price_trends.get('average_24h_change', 0)
             if avg_change > 0:
                 insights.append(f"Market shows positive momentum with average 24h change of +{avg_change:.2f}%")
@@ -1,11 +1,20 @@
 from langgraph.graph import StateGraph, END, START
 from langgraph.graph.state import CompiledStateGraph
 from typing import TypedDict, List, Dict, Any, Optional
-from datetime import datetime
+import heapq
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of coins kept in the precomputed market cap ranking
+TOP_N = 10
+
+# Aggregates computed once after data collection (read-only downstream)
+class MarketStats(TypedDict):
+    mc_top_idx: List[int]  # indices of the TOP_N largest market caps, descending
+    change_valid_idx: List[int]  # indices of coins with a 24h price change
+
 # LangGraph state schema (TypedDict for performance)
 class CryptoAnalysisState(TypedDict):
     # Input parameters
@@ -15,22 +24,42 @@ class CryptoAnalysisState(TypedDict):
     # Data storage
     raw_crypto_data: List[Dict[str, Any]]
     validated_crypto_data: List[Dict[str, Any]]
+    market_stats: MarketStats
     
     # Analysis results
     analysis_results: Dict[str, Any]
+    ai_insights: List[str]
+    chart_paths: List[str]
     
     # Workflow tracking
     workflow_status: str
     data_collection_status: str
     analysis_status: str
     has_price_changes: bool
+    visualization_status: str
+    insights_status: str
     
     # Error handling
     warnings: List[str]
     errors: List[str]
-    timestamp: str
+    timestamp_ns: int  # time.time_ns(); converted to ISO only in the API response
 
-def data_collection_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
+def compute_market_stats(crypto_data: List[Dict[str, Any]]) -> MarketStats:
+    """One pass for masks plus a top-N market cap heap, shared by all nodes"""
+    market_caps = []
+    change_valid_idx = []
+    
+    for i, crypto in enumerate(crypto_data):
+        market_caps.append(crypto.get("market_cap") or 0)
+        if crypto.get("price_change_percentage_24h") is not None:
+            change_valid_idx.append(i)
+    
+    return {
+        "mc_top_idx": heapq.nlargest(TOP_N, range(len(crypto_data)), key=market_caps.__getitem__),
+        "change_valid_idx": change_valid_idx
+    }
+
+async def data_collection_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
     """LangGraph node for data collection with Pydantic validation"""
     logger.info("🔍 LangGraph: Data collection node starting...")
     
@@ -39,21 +68,22 @@ def data_collection_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
         from ..utils.schema_converters import SchemaConverter
         
         # Fetch raw data
-        raw_data = crypto_service.get_basic_crypto_data(state["num_coins"])
+        raw_data = await crypto_service.get_basic_crypto_data(state["num_coins"])
         
         # Validate using Pydantic models
         validated_data, validation_errors = SchemaConverter.validate_raw_crypto_data(raw_data)
         
+        # Precompute shared aggregates once
+        market_stats = compute_market_stats(validated_data)
+        
         # Update state
         state.update({
             "raw_crypto_data": raw_data,
             "validated_crypto_data": validated_data,
+            "market_stats": market_stats,
             "data_collection_status": "completed",
-            "has_price_changes": any(
-                crypto.get("price_change_percentage_24h") is not None 
-                for crypto in validated_data
-            ),
-            "timestamp": datetime.now().isoformat()
+            "has_price_changes": bool(market_stats["change_valid_idx"]),
+            "timestamp_ns": time.time_ns()
         })
         
         # Add warnings for validation errors
@@ -72,65 +102,54 @@ def data_collection_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
         state.update({
             "data_collection_status": "failed",
             "errors": [str(e)],
-            "timestamp": datetime.now().isoformat()
+            "timestamp_ns": time.time_ns()
         })
         return state
 
 def analysis_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
-    """LangGraph node for analysis"""
+    """LangGraph node for analysis (delegates to AnalysisAgent)"""
     logger.info("📊 LangGraph: Analysis node starting...")
     
-    try:
-        crypto_data = state["validated_crypto_data"]
-        
-        if not crypto_data:
-            raise Exception("No validated crypto data available for analysis")
-        
-        # Perform analysis
-        analysis_results = {
-            "market_overview": {
-                "total_cryptos_analyzed": len(crypto_data),
-                "total_market_cap": sum(crypto.get("market_cap", 0) for crypto in crypto_data),
-                "average_price": sum(crypto.get("current_price", 0) for crypto in crypto_data) / len(crypto_data)
-            },
-            "top_performers": {
-                "by_market_cap": sorted(crypto_data, key=lambda x: x.get("market_cap", 0), reverse=True)[:5]
-            }
-        }
-        
-        # Add price analysis if available
-        if state["has_price_changes"]:
-            price_changes = [
-                crypto.get("price_change_percentage_24h", 0) 
-                for crypto in crypto_data 
-                if crypto.get("price_change_percentage_24h") is not None
-            ]
-            
-            if price_changes:
-                analysis_results["price_trends"] = {
-                    "average_24h_change": sum(price_changes) / len(price_changes),
-                    "positive_movers": len([c for c in price_changes if c > 0]),
-                    "negative_movers": len([c for c in price_changes if c < 0])
-                }
-        
-        # Update state
-        state.update({
-            "analysis_results": analysis_results,
-            "analysis_status": "completed",
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        logger.info("✅ Analysis completed successfully")
-        return state
-        
-    except Exception as e:
-        logger.error(f"❌ Analysis failed: {e}")
-        state.update({
-            "analysis_status": "failed",
-            "errors": [str(e)],
-            "timestamp": datetime.now().isoformat()
-        })
-        return state
+    from .analysis_agent import analysis_agent
+    
+    state = analysis_agent.analyze_crypto_data(state)
+    
+    if state["analysis_status"] == "completed":
+        # Set here rather than in the router: LangGraph drops router state changes
+        state["workflow_status"] = "completed"
+    else:
+        logger.error("❌ Analysis failed")
+        state["errors"] = [state.pop("analysis_error", "Analysis failed")]
+    
+    state["timestamp_ns"] = time.time_ns()
+    return state
+
+# Visualization and insights run as parallel branches after analysis, so each
+# returns only the state keys it owns (the Excel report is built by the API layer)
+
+def visualization_node(state: CryptoAnalysisState) -> Dict[str, Any]:
+    """LangGraph node for chart generation"""
+    logger.info("📈 LangGraph: Visualization node starting...")
+    
+    from .visualization_agent import visualization_agent
+    
+    result = visualization_agent.generate_charts(state)
+    return {
+        "chart_paths": result.get("chart_paths", []),
+        "visualization_status": result["visualization_status"]
+    }
+
+async def insights_node(state: CryptoAnalysisState) -> Dict[str, Any]:
+    """LangGraph node for AI insights (async, overlaps OpenAI network I/O)"""
+    logger.info("🤖 LangGraph: Insights node starting...")
+    
+    from .insights_agent import ai_insights_agent
+    
+    result = await ai_insights_agent.generate_insights(state)
+    return {
+        "ai_insights": result["ai_insights"],
+        "insights_status": result["insights_status"]
+    }
 
 def error_handling_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
     """Handle errors gracefully"""
@@ -138,7 +157,7 @@ def error_handling_node(state: CryptoAnalysisState) -> CryptoAnalysisState:
     
     state.update({
         "workflow_status": "completed_with_errors",
-        "timestamp": datetime.now().isoformat()
+        "timestamp_ns": time.time_ns()
     })
     
     if not state.get("warnings"):
@@ -155,23 +174,34 @@ def should_continue_to_analysis(state: CryptoAnalysisState) -> str:
     else:
         return "error_handler"
 
-def check_workflow_completion(state: CryptoAnalysisState) -> str:
-    """Route based on analysis success"""
+def check_workflow_completion(state: CryptoAnalysisState) -> str | List[str]:
+    """Route based on analysis success (fan out to the independent output nodes)"""
+    if state.get("analysis_status") == "completed":
+        return ["visualization", "insights"]
+    else:
+        return "error_handler"
+
+def check_analysis_completion(state: CryptoAnalysisState) -> str:
+    """Route based on analysis success (data-only workflow, no output nodes)"""
     if state.get("analysis_status") == "completed":
-        # Mark workflow as completed
-        state["workflow_status"] = "completed"
         return END
     else:
         return "error_handler"
 
-def create_crypto_analysis_workflow() -> CompiledStateGraph:
-    """Create and compile the LangGraph workflow"""
+def create_crypto_analysis_workflow(with_outputs: bool = True) -> CompiledStateGraph:
+    """Create and compile the LangGraph workflow
+    
+    with_outputs=False stops after analysis (no charts, no AI insights).
+    """
     
     workflow = StateGraph(CryptoAnalysisState)
     
     # Add nodes
     workflow.add_node("data_collection", data_collection_node)
     workflow.add_node("analysis", analysis_node)
+    if with_outputs:
+        workflow.add_node("visualization", visualization_node)
+        workflow.add_node("insights", insights_node)
     workflow.add_node("error_handler", error_handling_node)
     
     # Add edges
@@ -186,14 +216,29 @@ def create_crypto_analysis_workflow() -> CompiledStateGraph:
         }
     )
     
-    workflow.add_conditional_edges(
-        "analysis",
-        check_workflow_completion,
-        {
-            END: END,
-            "error_handler": "error_handler"
-        }
-    )
+    if with_outputs:
+        workflow.add_conditional_edges(
+            "analysis",
+            check_workflow_completion,
+            {
+                "visualization": "visualization",
+                "insights": "insights",
+                "error_handler": "error_handler"
+            }
+        )
+        
+        # Fan in at END
+        workflow.add_edge("visualization", END)
+        workflow.add_edge("insights", END)
+    else:
+        workflow.add_conditional_edges(
+            "analysis",
+            check_analysis_completion,
+            {
+                END: END,
+                "error_handler": "error_handler"
+            }
+        )
     
     workflow.add_edge("error_handler", END)
     
@@ -202,5 +247,6 @@ def create_crypto_analysis_workflow() -> CompiledStateGraph:
     
     return compiled_workflow
 
-# Create the workflow instance
+# Create the workflow instances (full analysis, and data + analysis only for report downloads)
 crypto_workflow = create_crypto_analysis_workflow()
+crypto_data_workflow = create_crypto_analysis_workflow(with_outputs=False)
@@ -1,14 +1,27 @@
 
 import logging
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
+import numpy as np
+from ._svg_charts import bar_chart, pie_chart
 from typing import Dict, Any, List
 import os
+import uuid
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first (O(N) partition + O(k log k) sort)"""
+    if values.size > k:
+        idx = np.argpartition(-values, k)[:k]
+    else:
+        idx = np.arange(values.size)
+    return idx[np.argsort(-values[idx], kind="stable")]
+
+def _write_chart(chart_path: str, svg: str) -> str:
+    with open(chart_path, "w", encoding="utf-8") as f:
+        f.write(svg)
+    return chart_path
+
 class VisualizationAgent:
     def __init__(self):
         self.name = "VisualizationAgent"
@@ -24,66 +37,74 @@ class VisualizationAgent:
             if not crypto_data:
                 raise Exception("No crypto data available for visualization")
             
-            # Convert to DataFrame
-            df = pd.DataFrame(crypto_data)
+            # Extract the plotted columns once into NumPy arrays
+            n = len(crypto_data)
+            names = np.array([coin.get("name") for coin in crypto_data], dtype=object)
+            symbols = np.array([coin.get("symbol") for coin in crypto_data], dtype=object)
+            market_cap = np.fromiter(
+                (coin.get("market_cap") or 0 for coin in crypto_data), dtype=np.float64, count=n
+            )
+            change_24h = np.fromiter(
+                (
+                    np.nan if coin.get("price_change_percentage_24h") is None
+                    else coin["price_change_percentage_24h"]
+                    for coin in crypto_data
+                ),
+                dtype=np.float64,
+                count=n,
+            )
             
             # Create charts directory
             os.makedirs("reports/charts", exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            # Timestamp plus a random suffix: concurrent runs never share a chart name
+            chart_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
             
             chart_paths = []
             
-            # 1. Market Cap Distribution (Bar Chart)
-            plt.figure(figsize=(12, 6))
-            top_10 = df.nlargest(10, 'market_cap')
-            plt.bar(range(len(top_10)), top_10['market_cap'], color='skyblue')
-            plt.xticks(range(len(top_10)), top_10['name'], rotation=45, ha='right')
-            plt.title('Top 10 Cryptocurrencies by Market Cap')
-            plt.ylabel('Market Cap (USD)')
-            plt.tight_layout()
+            # Reuse the rankings computed after data collection when available
+            market_stats = state.get("market_stats")
+            if market_stats:
+                top_10 = np.asarray(market_stats["mc_top_idx"][:10], dtype=np.intp)
+                change_idx = np.asarray(market_stats["change_valid_idx"], dtype=np.intp)
+            else:
+                top_10 = _top_k_indices(market_cap, 10)
+                change_idx = np.flatnonzero(~np.isnan(change_24h))
             
-            chart_path = f"reports/charts/market_cap_distribution_{timestamp}.png"
-            plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-            chart_paths.append(chart_path)
-            plt.close()
+            # 1. Market Cap Distribution (Bar Chart)
+            chart_paths.append(_write_chart(
+                f"reports/charts/market_cap_distribution_{chart_id}.svg",
+                bar_chart(
+                    names[top_10], market_cap[top_10],
+                    'Top 10 Cryptocurrencies by Market Cap', y_label='Market Cap (USD)'
+                )
+            ))
             
             # 2. Price Change Distribution (if available)
             if state.get("has_price_changes"):
-                price_changes = df[df['price_change_percentage_24h'].notna()]
-                if not price_changes.empty:
-                    plt.figure(figsize=(10, 6))
-                    colors = ['green' if x > 0 else 'red' for x in price_changes['price_change_percentage_24h']]
-                    plt.bar(range(len(price_changes)), price_changes['price_change_percentage_24h'], color=colors, alpha=0.7)
-                    plt.xticks(range(len(price_changes)), price_changes['symbol'], rotation=45)
-                    plt.title('24h Price Changes')
-                    plt.ylabel('Price Change (%)')
-                    plt.axhline(y=0, color='black', linestyle='-', alpha=0.3)
-                    plt.tight_layout()
-                    
-                    chart_path = f"reports/charts/price_changes_{timestamp}.png"
-                    plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-                    chart_paths.append(chart_path)
-                    plt.close()
+                if change_idx.size:
+                    changes = change_24h[change_idx]
+                    chart_paths.append(_write_chart(
+                        f"reports/charts/price_changes_{chart_id}.svg",
+                        bar_chart(
+                            symbols[change_idx], changes, '24h Price Changes', y_label='Price Change (%)',
+                            colors=np.where(changes > 0, 'green', 'red'), opacity=0.7
+                        )
+                    ))
             
             # 3. Market Overview Pie Chart
             market_overview = analysis_results.get("market_overview", {})
             if market_overview:
-                plt.figure(figsize=(8, 8))
-                # Create pie chart of top 5 by market cap
-                top_5 = df.nlargest(5, 'market_cap')
-                others_market_cap = df.iloc[5:]['market_cap'].sum()
-                
-                sizes = list(top_5['market_cap']) + [others_market_cap] if others_market_cap > 0 else list(top_5['market_cap'])
-                labels = list(top_5['name']) + ['Others'] if others_market_cap > 0 else list(top_5['name'])
+                # Create pie chart of top 5 by market cap (head of the top 10 ranking)
+                top_5 = top_10[:5]
+                others_market_cap = float(market_cap.sum() - market_cap[top_5].sum())
                 
-                plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-                plt.title('Market Cap Distribution')
-                plt.axis('equal')
+                sizes = list(market_cap[top_5]) + [others_market_cap] if others_market_cap > 0 else list(market_cap[top_5])
+                labels = list(names[top_5]) + ['Others'] if others_market_cap > 0 else list(names[top_5])
                 
-                chart_path = f"reports/charts/market_distribution_{timestamp}.png"
-                plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-                chart_paths.append(chart_path)
-                plt.close()
+                chart_paths.append(_write_chart(
+                    f"reports/charts/market_distribution_{chart_id}.svg",
+                    pie_chart(labels, sizes, 'Market Cap Distribution')
+                ))
             
             # Update state
             state["chart_paths"] = chart_paths
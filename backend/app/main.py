@@ -1,42 +1,127 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+import glob
+import hashlib
 import logging
+import operator
 import os
+import threading
+from contextlib import asynccontextmanager
 from datetime import datetime
 from io import BytesIO
-import openpyxl
-from openpyxl.styles import Font
+import anyio.to_thread
+import orjson
+from dotenv import load_dotenv
 
-from .agents.langgraph_workflow import crypto_workflow
+from .agents.langgraph_workflow import crypto_workflow, crypto_data_workflow
 from .models.schemas import AnalysisRequest, AnalysisResponse
+from .services.crypto_service import crypto_service
 from .utils.schema_converters import SchemaConverter
 
+# Load environment variables
+load_dotenv()
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Frontends allowed to call the API (comma-separated CORS_ORIGINS overrides the
+# Vite and Streamlit dev servers); preflights are cached by browsers for a day
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173,http://localhost:8501"
+    ).split(",")
+    if origin.strip()
+]
+CORS_MAX_AGE = 86400
+
+# Thread pool size for blocking work (report building) run off the event loop
+THREADPOOL_TOKENS = 100
+
+# Only the most recently used reports (content-addressed) and charts are kept on disk
+REPORTS_DIR = "reports"
+MAX_CACHED_REPORTS = 50
+MAX_CHART_FILES = 150  # three charts per /analyze run
+REPORTS_CACHE_CONTROL = "public, max-age=300, immutable"
+# Report (content digest) and chart (timestamp + random suffix) names are never reused
+# for different content, so both can be cached as immutable
+CACHEABLE_REPORT_SUFFIXES = (".xlsx", ".svg")
+
+# Excel report layout (xlsxwriter formats are per workbook, so only their properties are shared)
+_TITLE_FORMAT = {'bold': True, 'font_size': 14}
+_HEADER_FORMAT = {'bold': True}
+_SUMMARY_FORMAT = {'bold': True, 'font_size': 12}
+_HEADERS = ("ID", "Symbol", "Name", "Current Price", "Market Cap", "24h Change (%)")
+# Validated coin dicts always carry every CryptoData field; one C call extracts a whole row
+_ROW_GETTER = operator.itemgetter(
+    "id", "symbol", "name", "current_price", "market_cap", "price_change_percentage_24h"
+)
+
+# One coin pushed through validation and the NumPy reductions at startup
+_WARM_UP_COIN = {
+    "id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "current_price": 1.0,
+    "market_cap": 1, "total_volume": 1, "price_change_percentage_24h": 0.0
+}
+
+def warm_up() -> None:
+    """Pay the first-request import/compile costs at startup instead"""
+    # Nodes import their agents lazily; import them now
+    from .agents import analysis_agent, insights_agent, visualization_agent  # noqa: F401
+    from .agents._market_arrays import to_arrays, market_aggregates
+    
+    SchemaConverter.request_to_langgraph_state(AnalysisRequest(num_coins=1))
+    validated_data, _ = SchemaConverter.validate_raw_crypto_data([_WARM_UP_COIN])
+    market_aggregates(to_arrays(validated_data))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_TOKENS
+    warm_up()
+    logger.info("🔥 Agents, validation and NumPy paths warmed up")
+    yield
+    # Release the pooled CoinGecko connections on worker shutdown
+    await crypto_service.aclose()
+
 app = FastAPI(
     title="Crypto AI Analyst - LangGraph Architecture",
     description="Multi-agent crypto analysis with proper schema separation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for simplicity
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    max_age=CORS_MAX_AGE
 )
 
 # Create reports directory and mount as static files
-os.makedirs("reports", exist_ok=True)
-os.makedirs("reports/charts", exist_ok=True)
-app.mount("/reports", StaticFiles(directory="reports"), name="reports")
+os.makedirs(REPORTS_DIR, exist_ok=True)
+os.makedirs(f"{REPORTS_DIR}/charts", exist_ok=True)
+class ReportFiles(StaticFiles):
+    """StaticFiles that lets browsers reuse reports and charts (ETag/304 handled by StaticFiles)"""
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if str(full_path).endswith(CACHEABLE_REPORT_SUFFIXES):
+            response.headers["Cache-Control"] = REPORTS_CACHE_CONTROL
+        return response
+
+app.mount("/reports", ReportFiles(directory=REPORTS_DIR), name="reports")
 
-# Serve the HTML frontend
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+# Serve the HTML frontend (repo-level frontend/, independent of the working directory)
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "frontend")
+if os.path.isdir(FRONTEND_DIR):
+    app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
+else:
+    logger.warning(f"⚠️ Frontend directory not found, /static not mounted: {FRONTEND_DIR}")
 
 @app.get("/")
 async def root():
@@ -47,7 +132,7 @@ async def root():
     }
 
 @app.post("/analyze", response_model=AnalysisResponse)
-async def run_analysis(request: AnalysisRequest):
+async def run_analysis(request: AnalysisRequest, background_tasks: BackgroundTasks):
     """Run complete crypto analysis and generate downloadable Excel report"""
     try:
         logger.info(f"🚀 Starting analysis for {request.num_coins} coins...")
@@ -58,8 +143,9 @@ async def run_analysis(request: AnalysisRequest):
         # Execute LangGraph workflow
         final_state = await crypto_workflow.ainvoke(initial_state)
         
-        # Generate Excel report file
-        report_filename = generate_excel_report(final_state)
+        # Generate Excel report file (blocking I/O, run in the thread pool)
+        report_filename = await run_in_threadpool(generate_excel_report, final_state)
+        background_tasks.add_task(prune_reports)
         
         # Convert back to API response
         response = SchemaConverter.langgraph_state_to_response(final_state)
@@ -75,60 +161,85 @@ async def run_analysis(request: AnalysisRequest):
         logger.error(f"❌ Analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
 
+def _write_excel_report(state: dict, target, options: dict) -> None:
+    """Write the analysis workbook to a file path or file-like object"""
+    import xlsxwriter
+    
+    wb = xlsxwriter.Workbook(target, options)
+    ws = wb.add_worksheet("Crypto Market Analysis")
+    title_fmt = wb.add_format(_TITLE_FORMAT)
+    header_fmt = wb.add_format(_HEADER_FORMAT)
+    summary_fmt = wb.add_format(_SUMMARY_FORMAT)
+    
+    # Header
+    ws.merge_range('A1:F1', "Cryptocurrency Market Analysis Report", title_fmt)
+    
+    # Timestamp
+    ws.write(1, 0, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Get data from state
+    crypto_data = state.get("validated_crypto_data") or ()
+    analysis_results = state.get("analysis_results", {})
+    
+    # Crypto Data Table (row 4)
+    ws.write_row(3, 0, _HEADERS, header_fmt)
+    
+    # Fill crypto data
+    for row_num, coin in enumerate(crypto_data, 4):
+        ws.write_row(row_num, 0, _ROW_GETTER(coin))
+    
+    # Analysis Summary (two blank rows after the table)
+    row = len(crypto_data) + 6
+    ws.write(row, 0, "Analysis Summary", summary_fmt)
+    
+    market_overview = analysis_results.get("market_overview", {})
+    for key, value in market_overview.items():
+        # Nested values (e.g. price_range) get one row per sub-key
+        items = (
+            [(f"{key}_{sub_key}", sub_value) for sub_key, sub_value in value.items()]
+            if isinstance(value, dict) else [(key, value)]
+        )
+        for label, item in items:
+            row += 1
+            ws.write_row(row, 0, [label.replace("_", " ").title(), item])
+    
+    wb.close()
+
+def build_xlsx_bytes(state: dict) -> bytes:
+    """Build the Excel report entirely in memory (no temp files, no disk write)"""
+    buffer = BytesIO()
+    _write_excel_report(state, buffer, {'in_memory': True})
+    return buffer.getvalue()
+
+def report_digest(state: dict) -> str:
+    """Hash of the inputs the Excel report is built from"""
+    payload = orjson.dumps([state.get("vs_currency"), state.get("validated_crypto_data", [])])
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
 def generate_excel_report(state: dict) -> str:
-    """Generate Excel report and save to reports directory"""
+    """Generate Excel report and save to reports directory (reused for identical data)"""
     try:
-        # Create workbook
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Crypto Market Analysis"
-        
-        # Header
-        ws.merge_cells("A1:F1")
-        ws["A1"] = "Cryptocurrency Market Analysis Report"
-        ws["A1"].font = Font(size=14, bold=True)
-        
-        # Timestamp
-        ws["A2"] = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        filename = f"crypto_analysis_{report_digest(state)}.xlsx"
+        filepath = os.path.join(REPORTS_DIR, filename)
         
-        # Get data from state
-        crypto_data = state.get("validated_crypto_data", [])
-        analysis_results = state.get("analysis_results", {})
+        try:
+            os.utime(filepath)  # keep it among the most recent for pruning
+            logger.info(f"📄 Reusing cached Excel report: {filename}")
+            return filename
+        except FileNotFoundError:
+            pass  # not built yet, or pruned by another worker: build it
         
-        # Crypto Data Table
-        headers = ["ID", "Symbol", "Name", "Current Price", "Market Cap", "24h Change (%)"]
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=4, column=col_num)
-            cell.value = header
-            cell.font = Font(bold=True)
-        
-        # Fill crypto data
-        for row_num, coin in enumerate(crypto_data, 5):
-            ws.cell(row=row_num, column=1).value = coin.get("id")
-            ws.cell(row=row_num, column=2).value = coin.get("symbol")
-            ws.cell(row=row_num, column=3).value = coin.get("name")
-            ws.cell(row=row_num, column=4).value = coin.get("current_price")
-            ws.cell(row=row_num, column=5).value = coin.get("market_cap")
-            ws.cell(row=row_num, column=6).value = coin.get("price_change_percentage_24h")
-        
-        # Analysis Summary
-        summary_start_row = len(crypto_data) + 7
-        ws.cell(row=summary_start_row, column=1).value = "Analysis Summary"
-        ws.cell(row=summary_start_row, column=1).font = Font(size=12, bold=True)
-        
-        market_overview = analysis_results.get("market_overview", {})
-        row = summary_start_row + 1
-        for key, value in market_overview.items():
-            ws.cell(row=row, column=1).value = key.replace("_", " ").title()
-            ws.cell(row=row, column=2).value = value
-            row += 1
-        
-        # Save to reports directory
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"crypto_analysis_{timestamp}.xlsx"
-        filepath = f"reports/{filename}"
-        
-        wb.save(filepath)
+        # Build under a unique temp name and rename atomically, so concurrent
+        # requests/workers never serve a half-written file
+        tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # constant_memory flushes each row to disk once the next one starts,
+            # so rows must be written in increasing order
+            _write_excel_report(state, tmp_path, {'constant_memory': True})
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
         logger.info(f"📄 Excel report saved: {filename}")
         
         return filename
@@ -137,6 +248,65 @@ def generate_excel_report(state: dict) -> str:
         logger.error(f"❌ Error generating Excel: {e}")
         return ""
 
+def prune_reports() -> None:
+    """Keep only the most recently used Excel reports and generated charts"""
+    _prune_files(os.path.join(REPORTS_DIR, "crypto_analysis_*.xlsx"), MAX_CACHED_REPORTS)
+    _prune_files(os.path.join(REPORTS_DIR, "charts", "*.svg"), MAX_CHART_FILES)
+
+def _prune_files(pattern: str, keep: int) -> None:
+    """Delete all but the `keep` most recently modified files matching `pattern`"""
+    paths = glob.glob(pattern)
+    if len(paths) <= keep:
+        return
+    
+    # Other workers may delete files between the glob and the stat
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    
+    mtimes.sort(reverse=True)
+    for _, path in mtimes[keep:]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove old file {path}: {e}")
+
+@app.get("/analyze/report")
+async def download_analysis_report(num_coins: int = 10, vs_currency: str = "usd"):
+    """Run data collection + analysis and return the Excel report built in memory (nothing saved)"""
+    try:
+        request = AnalysisRequest(num_coins=num_coins, vs_currency=vs_currency)
+        logger.info(f"🚀 Starting report analysis for {request.num_coins} coins...")
+        
+        initial_state = SchemaConverter.request_to_langgraph_state(request)
+        # Charts and AI insights aren't part of the workbook, so skip those nodes
+        final_state = await crypto_data_workflow.ainvoke(initial_state)
+        
+        # Don't return an empty workbook when data collection or analysis failed
+        if (
+            final_state.get("data_collection_status") != "completed"
+            or final_state.get("analysis_status") != "completed"
+        ):
+            raise Exception("; ".join(final_state.get("errors") or ["Workflow did not complete"]))
+        
+        # Building the workbook is blocking work, keep it off the event loop
+        content = await run_in_threadpool(build_xlsx_bytes, final_state)
+        
+    except Exception as e:
+        logger.error(f"❌ Report analysis failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
+    
+    filename = f"crypto_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    # Bytes are complete, so a plain Response sends them with a Content-Length
+    return Response(
+        content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @app.get("/health")
 async def health_check():
     return {
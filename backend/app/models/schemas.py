@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 class CryptoData(BaseModel):
+    model_config = ConfigDict(extra='ignore')  # CoinGecko sends many more fields
+    
     id: str
     symbol: str
     name: str
@@ -11,14 +13,8 @@ class CryptoData(BaseModel):
     market_cap_rank: Optional[int] = 0
     total_volume: Optional[int] = 0
     
-    # These might not be available in free tier
+    # Might not be available in free tier
     price_change_percentage_24h: Optional[float] = None
-    price_change_percentage_7d: Optional[float] = None
-    price_change_percentage_30d: Optional[float] = None
-    
-    # Additional safety fields
-    image: Optional[str] = None  # Coin image URL
-    last_updated: Optional[str] = None  # When data was last updated
 
 class AnalysisState(BaseModel):
     crypto_data: List[CryptoData] = []
@@ -1,8 +1,15 @@
 import os
-import requests
+import asyncio
+import copy
+import httpx
 import logging
+import orjson
+import random
+import threading
 import time
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Any
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,105 +17,198 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Retry policy for throttled/unavailable responses and connection errors
+MAX_ATTEMPTS = 3
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRY_DELAY = 120  # never wait longer than the old fixed 429 pause
+
 class CryptoService:
     def __init__(self):
         self.base_url = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
-        self.session = requests.Session()
+        # Pooled client, created on first use (see `client`)
+        self._client: httpx.AsyncClient | None = None
         
-        # Free tier conservative rate limiting
-        self.rate_limit_delay = 2.5  # 2.5 seconds = ~24 calls/min (safe for 30/min limit)
-        self.last_request_time = 0
-
-    def _respect_rate_limit(self):
-        """Conservative rate limiting for free tier"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        # Endpoint paths and the query parameters that never change
+        self._markets_path = "/coins/markets"
+        self._static_markets_params = {
+            'order': 'market_cap_desc',
+            'sparkline': 'false',
+            'price_change_percentage': '24h'    # Try to get 24h changes
+        }
+        self._simple_price_path = "/simple/price"
+        self._static_simple_price_params = {
+            'vs_currencies': 'usd',          # vs_currencies (plural) for simple/price
+            'include_24hr_change': 'true',
+            'include_24hr_vol': 'true'
+        }
         
-        if time_since_last_request < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_request
-            logger.info(f"⏳ Rate limiting: waiting {sleep_time:.1f}s")
-            time.sleep(sleep_time)
+        # Free tier conservative rate limiting (non-blocking: waits yield the event loop)
+        # 2.5 seconds = ~24 calls/min (safe for 30/min limit), split across the
+        # WEB_CONCURRENCY worker processes since each has its own limiter
+        self.rate_limit_delay = 2.5 * max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        self.last_request_time = 0
+        self._rate_lock = asyncio.Lock()
         
-        self.last_request_time = time.time()
+        # Market snapshots barely move within a minute: serve repeats from cache
+        # (lock because the service instance is shared)
+        self._cache = TTLCache(maxsize=64, ttl=60)
+        self._cache_lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client (only ~2 concurrent CoinGecko requests ever run);
+        re-created if a previous app lifespan closed it"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=30,
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+                headers={"User-Agent": "crypto-ai-analyst", "Accept": "application/json"}
+            )
+        return self._client
+
+    async def aclose(self):
+        """Release pooled connections (the next request opens a new client)"""
+        if self._client is not None:
+            await self._client.aclose()
+
+    def _cache_get(self, key):
+        """Deep copy of a cached response (callers mutate what they get back)"""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        return copy.deepcopy(cached) if cached is not None else None
+
+    def _cache_set(self, key, value):
+        with self._cache_lock:
+            self._cache[key] = copy.deepcopy(value)
+
+    async def _respect_rate_limit(self):
+        """Conservative rate limiting for free tier (callers queue on the lock in order)"""
+        async with self._rate_lock:
+            current_time = time.monotonic()
+            time_since_last_request = current_time - self.last_request_time
+            
+            if time_since_last_request < self.rate_limit_delay:
+                sleep_time = self.rate_limit_delay - time_since_last_request
+                logger.info(f"⏳ Rate limiting: waiting {sleep_time:.1f}s")
+                await asyncio.sleep(sleep_time)
+            
+            self.last_request_time = time.monotonic()
+
+    @staticmethod
+    def _retry_delay(response: httpx.Response | None, attempt: int) -> float:
+        """Retry-After if the server sent one, else exponential backoff (plus jitter)"""
+        delay = 2 ** attempt
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    pass
+        return min(MAX_RETRY_DELAY, max(0.0, delay) + random.uniform(0, 1))
 
-    def fetch_top_cryptos(self, vs_currency: str = "usd", per_page: int = 10, page: int = 1) -> List[Dict[str, Any]]:
+    async def _get(self, url: str, params: Dict[str, str], max_attempts: int = MAX_ATTEMPTS) -> httpx.Response:
+        """Rate-limited GET, retried on 429/5xx and connection errors"""
+        for attempt in range(max_attempts):
+            await self._respect_rate_limit()
+            last_attempt = attempt == max_attempts - 1
+            
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                delay = self._retry_delay(None, attempt)
+                logger.warning(f"⚠️ Request error ({e}), retrying in {delay:.1f}s...")
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                delay = self._retry_delay(response, attempt)
+                logger.warning(f"⚠️ HTTP {response.status_code}, retrying in {delay:.1f}s...")
+            
+            await asyncio.sleep(delay)
+
+    async def fetch_top_cryptos(self, vs_currency: str = "usd", per_page: int = 10, page: int = 1) -> List[Dict[str, Any]]:
         """Fetch top cryptocurrencies - FREE TIER COMPATIBLE"""
+        key = ("markets", vs_currency, per_page, page)
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.info(f"⚡ Cache hit: {per_page} cryptos ({vs_currency})")
+            return cached
+        
+        response = None
         try:
-            self._respect_rate_limit()
-            
-            url = f"{self.base_url}/coins/markets"
+            url = self._markets_path
             
             # Required parameters for CoinGecko API
-            params = {
+            params = self._static_markets_params | {
                 'vs_currency': vs_currency,         # REQUIRED parameter
-                'order': 'market_cap_desc',
-                'per_page': min(per_page, 50),     # Conservative limit
-                'page': page,
-                'sparkline': False,
-                'price_change_percentage': '24h'    # Try to get 24h changes
+                'per_page': str(min(per_page, 50)),     # Conservative limit
+                'page': str(page)
             }
             
             logger.info(f"🔍 Fetching {per_page} cryptos (Free Tier)")
-            logger.info(f"🌐 URL: {url}")
+            logger.info(f"🌐 URL: {self.base_url}{url}")
             logger.info(f"📋 Params: {params}")
             
-            response = self.session.get(url, params=params, timeout=30)
-            
-            # Handle rate limiting
-            if response.status_code == 429:
-                logger.warning("⚠️ Rate limit hit! Waiting 2 minutes...")
-                time.sleep(120)  # Wait 2 minutes
-                response = self.session.get(url, params=params, timeout=30)
-            
+            response = await self._get(url, params)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)  # parse the raw bytes, no str decode
             
             logger.info(f"✅ Fetched {len(data)} cryptos successfully")
+            self._cache_set(key, data)
             return data
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"❌ Error fetching crypto data: {e}")
             logger.error(f"❌ Response status: {getattr(response, 'status_code', 'N/A')}")
             logger.error(f"❌ Response text: {getattr(response, 'text', 'N/A')[:200]}...")
             raise Exception(f"API Error: {str(e)}")
 
-    def fetch_simple_prices_with_change(self, coin_ids: List[str]) -> Dict[str, Any]:
+    async def fetch_simple_prices_with_change(self, coin_ids: List[str]) -> Dict[str, Any]:
         """Alternative method to get price changes (FREE TIER)"""
+        key = ("simple", tuple(sorted(coin_ids)))
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.info(f"⚡ Cache hit: price changes for {len(coin_ids)} coins")
+            return cached
+        
         try:
-            self._respect_rate_limit()
-            
-            url = f"{self.base_url}/simple/price"
-            params = {
-                'ids': ','.join(coin_ids[:50]),  # Limit for stability
-                'vs_currencies': 'usd',          # vs_currencies (plural) for simple/price
-                'include_24hr_change': 'true',
-                'include_24hr_vol': 'true'
+            url = self._simple_price_path
+            params = self._static_simple_price_params | {
+                'ids': ','.join(coin_ids[:50])  # Limit for stability
             }
             
             logger.info(f"📊 Fetching price changes for {len(coin_ids)} coins")
-            logger.info(f"🌐 URL: {url}")
+            logger.info(f"🌐 URL: {self.base_url}{url}")
             
-            response = self.session.get(url, params=params, timeout=30)
+            # Optional enrichment: one attempt, failures fall back to {}
+            response = await self._get(url, params, max_attempts=1)
             response.raise_for_status()
             
-            return response.json()
+            data = orjson.loads(response.content)
+            self._cache_set(key, data)
+            return data
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"❌ Error fetching price changes: {e}")
             return {}  # Return empty dict instead of crashing
 
-    def get_basic_crypto_data(self, num_coins: int = 10) -> List[Dict[str, Any]]:
+    async def get_basic_crypto_data(self, num_coins: int = 10) -> List[Dict[str, Any]]:
         """Get crypto data with fallback for price changes"""
         try:
             # Step 1: Get basic market data (this should work now)
-            market_data = self.fetch_top_cryptos(per_page=num_coins)
+            market_data = await self.fetch_top_cryptos(per_page=num_coins)
             
             # Step 2: Try to enhance with additional price data if needed
             coin_ids = [coin['id'] for coin in market_data[:10]]  # Limit to prevent API overuse
             
             try:
                 # Try to get additional price change data if main endpoint didn't provide it
-                price_changes = self.fetch_simple_prices_with_change(coin_ids)
+                price_changes = await self.fetch_simple_prices_with_change(coin_ids)
                 
                 # Merge price change data
                 for coin in market_data:
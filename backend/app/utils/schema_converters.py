@@ -1,43 +1,68 @@
 from typing import List, Dict, Any
 import logging
+from pydantic import TypeAdapter, ValidationError
+import time
 from datetime import datetime
 from ..models.schemas import CryptoData, AnalysisRequest, AnalysisResponse
 from ..agents.langgraph_workflow import CryptoAnalysisState
 
 logger = logging.getLogger(__name__)
 
+# Validates/dumps the whole coin list in one pydantic-core call
+_CRYPTO_LIST_ADAPTER = TypeAdapter(List[CryptoData])
+
+# Immutable initial values shared by every request; lists/dicts are created
+# per request in request_to_langgraph_state since nodes mutate them in place
+_STATE_TEMPLATE = {
+    "workflow_status": "starting",
+    "data_collection_status": "pending",
+    "analysis_status": "pending",
+    "visualization_status": "pending",
+    "insights_status": "pending",
+    "has_price_changes": False
+}
+
+def _iso(ns: int) -> str:
+    """ISO timestamp from time.time_ns(), only built for the final response"""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
 class SchemaConverter:
     @staticmethod
     def request_to_langgraph_state(request: AnalysisRequest) -> CryptoAnalysisState:
         """Convert API request to LangGraph initial state"""
-        return {
-            "num_coins": request.num_coins,
-            "vs_currency": request.vs_currency,
-            "raw_crypto_data": [],
-            "validated_crypto_data": [],
-            "analysis_results": {},
-            "workflow_status": "starting",
-            "data_collection_status": "pending",
-            "analysis_status": "pending",
-            "has_price_changes": False,
-            "warnings": [],
-            "errors": [],
-            "timestamp": datetime.now().isoformat()
-        }
+        state = _STATE_TEMPLATE.copy()
+        state.update(
+            num_coins=request.num_coins,
+            vs_currency=request.vs_currency,
+            raw_crypto_data=[],
+            validated_crypto_data=[],
+            analysis_results={},
+            ai_insights=[],
+            chart_paths=[],
+            warnings=[],
+            errors=[],
+            timestamp_ns=time.time_ns()
+        )
+        return state
     
     @staticmethod
     def langgraph_state_to_response(state: CryptoAnalysisState) -> AnalysisResponse:
         """Convert LangGraph final state to API response"""
-        status = "success" if state.get("workflow_status") == "completed" else "error"
+        workflow_status = state.get("workflow_status", "unknown")
+        status = "success" if workflow_status == "completed" else "error"
+        crypto_count = len(state.get("validated_crypto_data") or ())
         
         return AnalysisResponse(
             status=status,
-            message=f"LangGraph workflow processed {len(state.get('validated_crypto_data', []))} cryptocurrencies",
+            message="LangGraph workflow processed %d cryptocurrencies" % crypto_count,
             data={
                 "analysis_results": state.get("analysis_results", {}),
-                "crypto_count": len(state.get("validated_crypto_data", [])),
+                "ai_insights": state.get("ai_insights", []),
+                "chart_paths": state.get("chart_paths", []),
+                "crypto_count": crypto_count,
                 "has_price_changes": state.get("has_price_changes", False),
-                "workflow_status": state.get("workflow_status", "unknown")
+                "workflow_status": workflow_status,
+                "timestamp": _iso(state.get("timestamp_ns") or time.time_ns())
             },
             warnings=state.get("warnings", [])
         )
@@ -45,15 +70,23 @@ class SchemaConverter:
     @staticmethod
     def validate_raw_crypto_data(raw_data: List[Dict[str, Any]]) -> tuple[List[Dict], List[str]]:
         """Validate raw crypto data using Pydantic models"""
-        validated_data = []
-        validation_errors = []
+        try:
+            models = _CRYPTO_LIST_ADAPTER.validate_python(raw_data)
+            return _CRYPTO_LIST_ADAPTER.dump_python(models), []
+        except ValidationError as e:
+            # Error locations start with the list index of the failing coin
+            invalid = {err["loc"][0] for err in e.errors() if err["loc"]}
+        
+        valid_items = [item for i, item in enumerate(raw_data) if i not in invalid]
+        validated_data = _CRYPTO_LIST_ADAPTER.dump_python(_CRYPTO_LIST_ADAPTER.validate_python(valid_items))
         
-        for item in raw_data:
+        # Re-validate only the failing coins individually for per-coin messages
+        validation_errors = []
+        for i in sorted(invalid):
+            item = raw_data[i]
             try:
-                crypto_item = CryptoData(**item)
-                validated_data.append(crypto_item.dict())
+                CryptoData(**item)
             except Exception as e:
                 validation_errors.append(f"Validation error for {item.get('id', 'unknown')}: {str(e)}")
-                continue
                 
         return validated_data, validation_errors
@@ -0,0 +1,16 @@
+#!/usr/bin/env sh
+# Production entrypoint: multi-process uvicorn on uvloop + httptools
+# (both come with fastapi[standard]). Each worker runs the lifespan warm-up.
+set -e
+cd "$(dirname "$0")"
+
+# Exported so each worker's CoinGecko limiter takes its share of the rate budget
+export WEB_CONCURRENCY="${WEB_CONCURRENCY:-2}"
+
+exec uvicorn app.main:app \
+    --host "${HOST:-0.0.0.0}" \
+    --port "${PORT:-8000}" \
+    --workers "$WEB_CONCURRENCY" \
+    --loop uvloop \
+    --http httptools \
+    --timeout-graceful-shutdown 120